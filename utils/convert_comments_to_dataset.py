@@ -36,17 +36,16 @@ How it Works:
 
     3. **Dataset Partitioning**:
        - It assigns a 'partition' value of 0 (Train) or 1 (Test) randomly, 
-         aiming for an 80/20 split.
+         aiming for an 80/20 split (seeded, so the split is reproducible).
 
     4. **ID Generation**:
        - Generates a unique sequential 'comment_sentence_id' for every row.
 """
 
+import numpy as np
 import pandas as pd
-import random
 import re
 import os
-import sys
 
 # --- CONFIGURATION ---
 INPUT_FILE = "source_code_comments.csv"
@@ -79,35 +78,29 @@ KEYWORDS = {
     # 'Summary' is the default/fallback
 }
 
-def classify_comment(text):
+# Priority order of the rule-based categories; the first one that matches wins.
+CATEGORY_PRIORITY = ['Parameters', 'DevelopmentNotes', 'Usage', 'Expand']
+
+# One alternation per category, compiled once
+CATEGORY_PATTERNS = {
+    category: re.compile('|'.join(KEYWORDS[category]))
+    for category in CATEGORY_PRIORITY
+}
+
+def classify_comments(comments):
     """
-    Classifies a comment string into Usage, Parameters, Expand, 
+    Classifies a Series of comment strings into Usage, Parameters, Expand, 
     DevelopmentNotes, or Summary.
     """
-    text_lower = str(text).lower()
+    comments_lower = comments.astype(str).str.lower()
     
-    # Parameters (Specific variable descriptions)
-    for pattern in KEYWORDS['Parameters']:
-        if re.search(pattern, text_lower):
-            return 'Parameters'
-            
-    # DevelopmentNotes (Internal dev chatter, todos, warnings, rationale)
-    for pattern in KEYWORDS['DevelopmentNotes']:
-        if re.search(pattern, text_lower):
-            return 'DevelopmentNotes'
-
-    # Usage (How to run/call/import)
-    for pattern in KEYWORDS['Usage']:
-        if re.search(pattern, text_lower):
-            return 'Usage'
-            
-    # Expand (Elaboration, details, lists)
-    for pattern in KEYWORDS['Expand']:
-        if re.search(pattern, text_lower):
-            return 'Expand'
-            
-    # Summary (General description, default)
-    return 'Summary'
+    # One vectorized pass per category, then pick the highest-priority match
+    # (Summary is the general description default).
+    matches = [
+        comments_lower.str.contains(CATEGORY_PATTERNS[category], regex=True).to_numpy()
+        for category in CATEGORY_PRIORITY
+    ]
+    return np.select(matches, CATEGORY_PRIORITY, default='Summary')
 
 def clean_class_name(file_path):
     """Converts 'src/utils/AccessMixin.js' -> 'AccessMixin'"""
@@ -122,7 +115,13 @@ def main():
 
     print("Reading input CSV...")
     try:
-        df = pd.read_csv(INPUT_FILE)
+        # Only the used columns are parsed, with the multithreaded PyArrow reader
+        df = pd.read_csv(
+            INPUT_FILE,
+            engine='pyarrow',
+            dtype_backend='pyarrow',
+            usecols=['Comment Content', 'File Path']
+        )
     except Exception as e:
         print(f"Error reading CSV: {e}")
         return
@@ -130,46 +129,26 @@ def main():
     total_rows = len(df)
     print(f"Loaded {total_rows} comments. Processing...")
     
-    output_rows = []
+    rng = np.random.default_rng(42)
+    comment_content = df['Comment Content']
+    file_paths = df['File Path'].astype(str)
     
-    for index, row in df.iterrows():
-        # Update progress every 100 rows (or 10% if file is small)
-        if (index + 1) % 100 == 0:
-            percent = ((index + 1) / total_rows) * 100
-            sys.stdout.write(f"\r   -> Processed {index + 1}/{total_rows} comments ({percent:.1f}%)")
-            sys.stdout.flush()
-
-        comment_content = row.get('Comment Content', '')
-        file_path = row.get('File Path', 'Unknown')
-        
+    new_df = pd.DataFrame({
         # ID
-        cid = index + 1
-        
+        'comment_sentence_id': np.arange(1, total_rows + 1),
         # Class Name
-        class_name = clean_class_name(file_path)
-        
+        'class': file_paths.map(clean_class_name),
+        'comment_sentence': comment_content,
         # Partition (80/20 Split)
-        partition = 0 if random.random() > 0.2 else 1
-        
+        'partition': (rng.random(total_rows) <= 0.2).astype(np.int8),
         # Instance Type
-        instance_type = 1
-        
+        'instance_type': 1,
         # Category (New Classification Logic)
-        category = classify_comment(comment_content)
-        
-        output_rows.append({
-            'comment_sentence_id': cid,
-            'class': class_name,
-            'comment_sentence': comment_content,
-            'partition': partition,
-            'instance_type': instance_type,
-            'category': category
-        })
+        'category': classify_comments(comment_content)
+    })
     
-    # Clear the progress line
-    print("\nProcessing complete. Saving file...")
+    print("Processing complete. Saving file...")
 
-    new_df = pd.DataFrame(output_rows)
     new_df.to_csv(OUTPUT_FILE, index=False)
     
     print(f"Success! Saved {len(new_df)} rows to {OUTPUT_FILE}")
@@ -1,23 +1,49 @@
+import re
+
+import numpy as np
+
+# Patterns are compiled once and all applied in a single pass over the comments
+param_keywords = ['param', 'parameter', 'arg', 'argument', 'int', 'str', 'bool', 'float', 'list', 'dict', 'type']
+PARAMS_RE = re.compile('|'.join(param_keywords), re.IGNORECASE)
+code_symbols = [r'\(', r'\)', r'\[', r'\]', r'\{', r'\}', r'_', r'\.']
+SYMBOLS_RE = re.compile('|'.join(code_symbols))
+action_verbs = ['returns', 'return', 'creates', 'create', 'provides', 'provide', 'handles', 'handle',
+                'implements', 'implement', 'executes', 'execute', 'generates', 'generate',
+                'validates', 'validate', 'processes', 'process', 'manages', 'manage']
+VERB_RE = re.compile('^(' + '|'.join(action_verbs) + ')', re.IGNORECASE)
+DEFAULT_RE = re.compile('default', re.IGNORECASE)
+
+FEATURE_COLUMNS = ['comment_length', 'has_params', 'has_code_symbols', 'starts_with_verb', 'has_default']
+
+
+def _features(sentence):
+    """Computes the 5 metadata features of a single comment"""
+    if not isinstance(sentence, str):
+        # Missing comments count as empty (no words, no matches)
+        sentence = ''
+    return (
+        # 1. Comment length (number of words)
+        len(sentence.split()),
+        # 2. Has parameter-related keywords
+        PARAMS_RE.search(sentence) is not None,
+        # 3. Has code symbols
+        SYMBOLS_RE.search(sentence) is not None,
+        # 4. Starts with common action verbs
+        VERB_RE.match(sentence) is not None,
+        # 5. Mentions default values
+        DEFAULT_RE.search(sentence) is not None,
+    )
+
+
 def extract_metadata_features(df):
     """Extract metadata features from comment text"""
-    # 1. Comment length (number of words)
-    df['comment_length'] = df['comment_sentence'].str.split().str.len()
-    # 2. Has parameter-related keywords
-    param_keywords = ['param', 'parameter', 'arg', 'argument', 'int', 'str', 'bool', 'float', 'list', 'dict', 'type']
-    param_pattern = '|'.join(param_keywords)
-    df['has_params'] = df['comment_sentence'].str.contains(param_pattern, case=False, regex=True, na=False).astype(int)
-    # 3. Has code symbols
-    code_symbols = [r'\(', r'\)', r'\[', r'\]', r'\{', r'\}', r'_', r'\.']
-    code_pattern = '|'.join(code_symbols)
-    df['has_code_symbols'] = df['comment_sentence'].str.contains(code_pattern, regex=True, na=False).astype(int)
-    # 4. Starts with common action verbs
-    action_verbs = ['returns', 'return', 'creates', 'create', 'provides', 'provide', 'handles', 'handle',
-                    'implements', 'implement', 'executes', 'execute', 'generates', 'generate',
-                    'validates', 'validate', 'processes', 'process', 'manages', 'manage']
-    verb_pattern = '^(' + '|'.join(action_verbs) + ')'
-    df['starts_with_verb'] = df['comment_sentence'].str.contains(verb_pattern, case=False, regex=True, na=False).astype(
-        int)
-    # 5. Mentions default values
-    df['has_default'] = df['comment_sentence'].str.contains('default', case=False, na=False).astype(int)
-
-    return df
\ No newline at end of file
+    sentences = df['comment_sentence'].values
+    n_features = len(FEATURE_COLUMNS)
+    features = np.fromiter(
+        (value for sentence in sentences for value in _features(sentence)),
+        dtype=int,
+        count=n_features * len(sentences)
+    ).reshape(-1, n_features)
+    df[FEATURE_COLUMNS] = features
+
+    return df
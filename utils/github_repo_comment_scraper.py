@@ -1,26 +1,55 @@
 import csv
+import mmap
+import multiprocessing
 import os
 import shutil
-import subprocess
 import re
+import tarfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+import requests
+import urllib3
 
 # --- CONFIGURATION ---
 OUTPUT_FILE = "source_code_comments.csv"
+# Names of the repos already fully written to OUTPUT_FILE, one per line
+# (named after OUTPUT_FILE so the two always belong together)
+DONE_FILE = OUTPUT_FILE + ".done"
+# Output is written in bulk per repo through a large buffer (1 MB)
+WRITE_BUFFER_SIZE = 1 << 20
 
 # Extensions to scan and their comment patterns
 # (We focus on single-line comments for accurate line numbering)
+# Patterns are bytes, matched per line (MULTILINE) against the memory-mapped
+# file and pick up the first comment marker on each line, wherever it appears.
+# 'marker' is the plain comment token, used to skip comment-free files cheaply.
 FILE_TYPES = {
-    '.py':   {'single': r'#\s*(.*)'},
-    '.js':   {'single': r'//\s*(.*)'},
-    '.ts':   {'single': r'//\s*(.*)'},
-    '.jsx':  {'single': r'//\s*(.*)'},
-    '.tsx':  {'single': r'//\s*(.*)'},
-    '.java': {'single': r'//\s*(.*)'},
-    '.c':    {'single': r'//\s*(.*)'},
-    '.cpp':  {'single': r'//\s*(.*)'},
-    '.h':    {'single': r'//\s*(.*)'},
+    '.py':   {'marker': b'#',  'single': rb'^.*?#[^\S\n]*(.*)$'},
+    '.js':   {'marker': b'//', 'single': rb'^.*?//[^\S\n]*(.*)$'},
+    '.ts':   {'marker': b'//', 'single': rb'^.*?//[^\S\n]*(.*)$'},
+    '.jsx':  {'marker': b'//', 'single': rb'^.*?//[^\S\n]*(.*)$'},
+    '.tsx':  {'marker': b'//', 'single': rb'^.*?//[^\S\n]*(.*)$'},
+    '.java': {'marker': b'//', 'single': rb'^.*?//[^\S\n]*(.*)$'},
+    '.c':    {'marker': b'//', 'single': rb'^.*?//[^\S\n]*(.*)$'},
+    '.cpp':  {'marker': b'//', 'single': rb'^.*?//[^\S\n]*(.*)$'},
+    '.h':    {'marker': b'//', 'single': rb'^.*?//[^\S\n]*(.*)$'},
 }
 
+# Vendored, generated and build-output folders are not scanned
+SKIP_DIRS = {'.git', 'node_modules', 'third_party', 'vendor', 'dist', 'build', 'out', '.venv', '__pycache__'}
+# Files bigger than this (minified bundles, generated tables) are skipped
+MAX_FILE_SIZE = 2_000_000
+
+# Compiled once at import time instead of on every line
+COMMENT_PATTERNS = {
+    ext: re.compile(types['single'], re.MULTILINE)
+    for ext, types in FILE_TYPES.items()
+}
+# A '\r' that is not part of a '\r\n' line ending
+LONE_CR_PATTERN = re.compile(rb'\r(?!\n)')
+
 TARGET_REPOS = [
     "facebook/react",
     "tensorflow/tensorflow",
@@ -33,8 +62,20 @@ TARGET_REPOS = [
     "airbnb/javascript"
 ]
 
-def get_processed_repos(filename):
-    """Checks which repos are already fully scanned."""
+# Parallelism: repos are downloaded and scanned by a pool of worker threads,
+# while a semaphore caps how many downloads hit the network at the same time.
+MAX_WORKERS = 8
+MAX_CONCURRENT_DOWNLOADS = 4
+download_slots = threading.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+# Seconds to wait for the server (connecting or between received bytes)
+DOWNLOAD_TIMEOUT = 60
+# Comment extraction is CPU-bound, so files are scanned by a shared process
+# pool (one worker per core), fed in chunks of files.
+SCAN_WORKERS = os.cpu_count() or 1
+SCAN_CHUNK_SIZE = 64
+
+def get_repos_in_csv(filename):
+    """Lists the repos found in an existing output CSV (before DONE_FILE existed)."""
     processed = set()
     if not os.path.exists(filename):
         return processed
@@ -50,44 +91,119 @@ def get_processed_repos(filename):
         pass
     return processed
 
-def clone_repo(repo_name):
-    """Clones a repo to a temp folder using git (shallow clone)."""
-    repo_url = f"https://github.com/{repo_name}.git"
+def get_processed_repos(done_file, output_file):
+    """Checks which repos are already fully scanned."""
+    # The marker only describes an existing CSV; without it, start from scratch
+    if not os.path.exists(output_file):
+        return set()
+    
+    try:
+        with open(done_file, 'r', encoding='utf-8') as f:
+            return set(f.read().splitlines())
+    except FileNotFoundError:
+        pass
+    
+    # No marker file yet: rebuild it once from the existing CSV
+    processed = get_repos_in_csv(output_file)
+    if processed:
+        with open(done_file, 'w', encoding='utf-8') as f:
+            f.writelines(f"{repo}\n" for repo in sorted(processed))
+    return processed
+
+def mark_repo_done(done, repo_name):
+    """Appends a repo to the marker file, synced to disk once per repo."""
+    done.write(f"{repo_name}\n")
+    done.flush()
+    os.fsync(done.fileno())
+
+def get_scan_path(member):
+    """
+    Returns the path (inside the repo) of a tarball member that should be
+    scanned, or None if the member is skipped.
+    """
+    if not member.isfile() or member.size > MAX_FILE_SIZE:
+        return None
+    
+    # Drop the top-level '<repo>-<sha>/' folder of GitHub tarballs
+    parts = member.name.split('/')[1:]
+    if not parts or '..' in parts:
+        return None
+    if any(part in SKIP_DIRS for part in parts[:-1]):
+        return None
+    if os.path.splitext(parts[-1])[1].lower() not in FILE_TYPES:
+        return None
+    return os.path.join(*parts)
+
+def download_repo(repo_name):
+    """
+    Downloads the HEAD tarball of a repo and streams it into a temp folder,
+    extracting only the source files that will be scanned (no git clone).
+    """
+    tarball_url = f"https://codeload.github.com/{repo_name}/tar.gz/HEAD"
     temp_dir = f"temp_{repo_name.replace('/', '_')}"
     
     if os.path.exists(temp_dir):
         shutil.rmtree(temp_dir)
         
-    print(f"   -> Cloning {repo_name}...")
     try:
-        subprocess.run(
-            ["git", "clone", "--depth", "1", repo_url, temp_dir],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
+        with download_slots:
+            print(f"   -> Downloading {repo_name}...")
+            with requests.get(tarball_url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                # 'r|gz' reads the archive as a stream, without a staging file
+                with tarfile.open(fileobj=response.raw, mode='r|gz') as tar:
+                    for member in tar:
+                        scan_path = get_scan_path(member)
+                        if scan_path is None:
+                            continue
+                        
+                        target_path = os.path.join(temp_dir, scan_path)
+                        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                        with tar.extractfile(member) as src, open(target_path, 'wb') as dst:
+                            shutil.copyfileobj(src, dst)
         return temp_dir
-    except subprocess.CalledProcessError:
-        print(f"   !!! Error cloning {repo_name}. Skipping.")
+    # tarfile reads straight from response.raw, so errors while the body is
+    # streaming (truncated body, read timeout) come from urllib3, not requests
+    except (requests.RequestException, urllib3.exceptions.HTTPError, tarfile.TarError, OSError):
+        print(f"   !!! Error downloading {repo_name}. Skipping.")
+        shutil.rmtree(temp_dir, ignore_errors=True)
         return None
 
 def extract_comments_from_file(file_path, extension):
     """Reads a file and finds comments based on its extension."""
     comments = []
-    pattern = FILE_TYPES[extension]['single']
+    marker = FILE_TYPES[extension]['marker']
+    pattern = COMMENT_PATTERNS[extension]
     
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
+        # The file is memory-mapped and scanned as bytes; only the matched
+        # comments are decoded.
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Plain substring search is much faster than the regex engine,
+            # so files without any comment marker are never regex-scanned.
+            if mm.find(marker) == -1:
+                return comments
+            
+            # Text mode treats a bare '\r' (old Mac line ending) as a line break;
+            # such files are copied with their line endings turned into '\n'.
+            if mm.find(b'\r') != -1 and LONE_CR_PATTERN.search(mm):
+                data = mm[:].replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+            else:
+                data = mm
             
-        for i, line in enumerate(lines):
-            # Regex search for the comment pattern
-            match = re.search(pattern, line)
-            if match:
-                # Group 1 is the content after the comment symbol (# or //)
-                comment_content = match.group(1).strip()
-                if comment_content: # Ignore empty comments
-                    comments.append((i + 1, comment_content))
+            matches = [(match.start(), match.group(1)) for match in pattern.finditer(data)]
+            if not matches:
+                return comments
+            # Line number of a match = newlines before its start + 1
+            newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord('\n'))
+        
+        starts = [start for start, _ in matches]
+        line_nums = np.searchsorted(newlines, starts) + 1
+        for line_num, (_, content) in zip(line_nums.tolist(), matches):
+            # Group 1 is the content after the comment symbol (# or //)
+            comment_content = content.decode('utf-8', errors='ignore').strip()
+            if comment_content: # Ignore empty comments
+                comments.append((line_num, comment_content))
                     
     except Exception as e:
         # Skip files that can't be read (binary, etc.)
@@ -95,73 +211,103 @@ def extract_comments_from_file(file_path, extension):
         
     return comments
 
-def process_repo(repo_name, temp_dir, writer):
-    """Walks through the cloned repo and scrapes comments."""
+def scan_file(file_info):
+    """Pool worker: extracts the comments of one (full_path, rel_path, ext) file."""
+    full_path, rel_path, ext = file_info
+    return rel_path, ext, extract_comments_from_file(full_path, ext)
+
+def process_repo(repo_name, temp_dir, scan_pool):
+    """Walks through the downloaded repo and returns its comments as CSV rows."""
     print(f"   -> Scanning files in {repo_name}...")
-    file_count = 0
-    comment_count = 0
+    file_list = []
     
     for root, dirs, files in os.walk(temp_dir):
-        # Skip hidden folders like .git
-        if '.git' in dirs:
-            dirs.remove('.git')
+        # Skip hidden folders like .git and vendored/generated folders
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
             
         for file in files:
             ext = os.path.splitext(file)[1].lower()
             
             if ext in FILE_TYPES:
                 full_path = os.path.join(root, file)
+                try:
+                    if os.path.getsize(full_path) > MAX_FILE_SIZE:
+                        continue
+                except OSError:
+                    continue
                 # content_path is the relative path (e.g., src/index.js)
                 rel_path = os.path.relpath(full_path, temp_dir)
+                file_list.append((full_path, rel_path, ext))
+    
+    rows = []
+    for rel_path, ext, found_comments in scan_pool.map(scan_file, file_list, chunksize=SCAN_CHUNK_SIZE):
+        rows.extend(
+            (repo_name, rel_path, ext, line_num, content)
+            for line_num, content in found_comments
+        )
                 
-                found_comments = extract_comments_from_file(full_path, ext)
-                
-                for line_num, content in found_comments:
-                    writer.writerow([
-                        repo_name,
-                        rel_path,
-                        ext,
-                        line_num,
-                        content
-                    ])
-                    comment_count += 1
-                
-                file_count += 1
-                
-    print(f"   -> Done. Found {comment_count} comments in {file_count} files.")
+    print(f"   -> Done. Found {len(rows)} comments in {len(file_list)} files of {repo_name}.")
+    return rows
+
+def download_and_scan(repo_name, scan_pool):
+    """Worker: downloads a repo, scrapes its comments and removes the download."""
+    temp_dir = download_repo(repo_name)
+    if not temp_dir:
+        return None
+    
+    try:
+        return process_repo(repo_name, temp_dir, scan_pool)
+    finally:
+        # Cleanup
+        print(f"   -> Cleaning up {repo_name}...")
+        shutil.rmtree(temp_dir, ignore_errors=True)
 
 def main():
     # Setup CSV
     file_exists = os.path.exists(OUTPUT_FILE)
-    processed_repos = get_processed_repos(OUTPUT_FILE)
+    processed_repos = get_processed_repos(DONE_FILE, OUTPUT_FILE)
     
     mode = 'a' if file_exists else 'w'
     
-    with open(OUTPUT_FILE, mode, newline='', encoding='utf-8') as f:
+    with open(OUTPUT_FILE, mode, newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f, \
+            open(DONE_FILE, mode, encoding='utf-8') as done:
         writer = csv.writer(f)
         
         if not file_exists:
             writer.writerow(["Repository", "File Path", "Extension", "Line Number", "Comment Content"])
 
+        pending_repos = []
         for repo in TARGET_REPOS:
-            print(f"--- Processing: {repo} ---")
-            
             if repo in processed_repos:
-                print(f"   -> Already processed. Skipping.")
-                continue
-            
-            # Clone
-            temp_dir = clone_repo(repo)
-            if not temp_dir:
-                continue
-            
-            # Process
-            process_repo(repo, temp_dir, writer)
+                print(f"--- {repo}: already processed. Skipping. ---")
+            else:
+                pending_repos.append(repo)
+
+        # Download and scan in parallel; rows are written only from this thread,
+        # so the csv writer needs no lock.
+        # Scan workers are spawned rather than forked, since forking a process
+        # that is already running download threads is unsafe.
+        scan_context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=SCAN_WORKERS, mp_context=scan_context) as scan_pool, \
+                ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {executor.submit(download_and_scan, repo, scan_pool): repo for repo in pending_repos}
             
-            # Cleanup
-            print(f"   -> Cleaning up...")
-            shutil.rmtree(temp_dir)
-            print(f"--- Finished {repo} ---\n")
+            for future in as_completed(futures):
+                repo = futures[future]
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    print(f"   !!! Error processing {repo}: {e}. Skipping.")
+                    continue
+                if rows is None:
+                    continue
+                
+                writer.writerows(rows)
+                # The repo's rows must be on disk before it is marked as done
+                f.flush()
+                os.fsync(f.fileno())
+                mark_repo_done(done, repo)
+                print(f"--- Finished {repo} ---\n")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,22 +1,92 @@
+import os
+from functools import lru_cache
+
 import joblib
+import numpy as np
 import pandas as pd
-from scipy.sparse import hstack
+import torch
+from scipy import sparse
 
 from utils.extract_metadata_features import extract_metadata_features
 
+BERT_MODEL_FILE = "../outputs/bert_model_4cat_meta.pkl"
+# Int8 copy of the BERT model, (re)created on CPU runs when missing or older
+# than BERT_MODEL_FILE
+BERT_INT8_MODEL_FILE = "../outputs/bert_model_4cat_meta_int8.pkl"
+
+device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+
+def load_bert_model():
+    """Loads BERT, with its Linear layers quantized to int8 when running on CPU"""
+    # Dynamic quantization only runs on CPU
+    if device != 'cpu':
+        return joblib.load(BERT_MODEL_FILE)
+    # Reuse the int8 copy only if it was made after the current fp32 model
+    if (os.path.exists(BERT_INT8_MODEL_FILE)
+            and os.path.getmtime(BERT_INT8_MODEL_FILE) > os.path.getmtime(BERT_MODEL_FILE)):
+        return joblib.load(BERT_INT8_MODEL_FILE)
+
+    print("Quantizing BERT model to int8...")
+    bert = joblib.load(BERT_MODEL_FILE)
+    transformer = bert._first_module()
+    transformer.auto_model = torch.ao.quantization.quantize_dynamic(
+        transformer.auto_model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    try:
+        joblib.dump(bert, BERT_INT8_MODEL_FILE)
+    except OSError as e:
+        # Not being able to cache it only costs the quantization on the next run
+        print(f"Warning: could not save {BERT_INT8_MODEL_FILE}: {e}")
+    return bert
+
+
 # Loading model and pipeline encoders
 model = joblib.load("../outputs/best_model_final.pkl")
-bert_model = joblib.load("../outputs/bert_model_4cat_meta.pkl")
+bert_model = load_bert_model()
 class_encoder = joblib.load("../outputs/class_encoder_4cat_meta.pkl")
 label_encoder = joblib.load("../outputs/label_encoder_4cat_meta.pkl")
 
+# Move BERT to the GPU once (if available) and switch it to inference mode
+bert_model = bert_model.to(device)
+bert_model.eval()
+
+BERT_BATCH_SIZE = 64
+
+
+def _encode(sentences):
+    """Encodes a list of sentences with BERT, without autograd bookkeeping"""
+    with torch.inference_mode():
+        return bert_model.encode(
+            sentences,
+            batch_size=BERT_BATCH_SIZE,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            normalize_embeddings=False
+        )
+
+
+@lru_cache(maxsize=1024)
+def _encode_single(sentence):
+    """Cached embedding of a single sentence (repeated single-record requests)"""
+    embedding = _encode([sentence])[0]
+    embedding.setflags(write=False)
+    return embedding
+
+
+def encode_comments(sentences):
+    """Returns the BERT embeddings of a list of comment sentences"""
+    if len(sentences) == 1:
+        return _encode_single(sentences[0])[np.newaxis, :]
+    return _encode(sentences)
+
 
 def do_prediction(raw_data):
     # 1. Extract metadata features
     raw_data = extract_metadata_features(raw_data)
     # 2. Transform Text (BERT)
     # BERT expects a list/series of strings
-    text_embeddings = bert_model.encode(raw_data["comment_sentence"].tolist())
+    text_embeddings = encode_comments(raw_data["comment_sentence"].tolist())
     # 3. Transform Metadata (Category)
     # Class encoder expects a 2D array/DataFrame
     encoded_meta = class_encoder.transform(pd.DataFrame(raw_data["class"].tolist()))
@@ -24,8 +94,17 @@ def do_prediction(raw_data):
     manual_cols = ['comment_length', 'has_params', 'has_code_symbols', 'starts_with_verb', 'has_default']
     manual_features = raw_data[manual_cols].values
 
-    # 5. Concatenate: [Text] + [Categorical Meta] + [Manual Heuristics]
-    X_final = hstack([text_embeddings, encoded_meta, manual_features])
+    # 5. Concatenate: [Categorical Meta] + [Text] + [Manual Heuristics]
+    # (same column order as the training features built in encoding.ipynb)
+    # Filled into one preallocated dense matrix instead of a sparse hstack
+    if sparse.issparse(encoded_meta):
+        encoded_meta = encoded_meta.toarray()
+    d_meta = encoded_meta.shape[1]
+    d_text = text_embeddings.shape[1]
+    X_final = np.empty((len(raw_data), d_meta + d_text + len(manual_cols)), dtype=np.float32)
+    X_final[:, :d_meta] = encoded_meta
+    X_final[:, d_meta:d_meta + d_text] = text_embeddings
+    X_final[:, d_meta + d_text:] = manual_features
 
     # 6. Predict the target (category)
     prediction_id = model.predict(X_final)
@@ -40,4 +119,4 @@ if __name__ == "__main__":
         "comment_sentence": ["Request to API fails miserably. Need to change the input variable to String"],
         "class": ["tfprof_logger"]
     })
-    do_prediction(raw_data)
\ No newline at end of file
+    do_prediction(raw_data)
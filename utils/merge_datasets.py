@@ -1,4 +1,6 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import os
 
 # --- CONFIGURATION ---
@@ -6,6 +8,20 @@ ORIGINAL_FILE = "../datasets/original-code-comment-classification.csv"  # The ex
 NEW_DATA_FILE = "../datasets/classified_comments_dataset.csv"  # The new data you just generated
 OUTPUT_FILE   = "code-comment-classification_extended.csv" # The final merged file
 
+# Explicit column types, so the PyArrow reader skips type inference
+DATASET_DTYPES = {
+    'comment_sentence_id': 'int64',
+    'class': 'string[pyarrow]',
+    'comment_sentence': 'string[pyarrow]',
+    'partition': 'int64',
+    'instance_type': 'int64',
+    'category': 'string[pyarrow]',
+}
+
+def read_dataset(file_path):
+    """Reads a comment classification CSV with the multithreaded PyArrow parser."""
+    return pd.read_csv(file_path, engine='pyarrow', dtype_backend='pyarrow', dtype=DATASET_DTYPES)
+
 def main():
     # Check if files exist
     if not os.path.exists(ORIGINAL_FILE):
@@ -17,8 +33,8 @@ def main():
 
     print("Reading files...")
     try:
-        df_orig = pd.read_csv(ORIGINAL_FILE)
-        df_new = pd.read_csv(NEW_DATA_FILE)
+        df_orig = read_dataset(ORIGINAL_FILE)
+        df_new = read_dataset(NEW_DATA_FILE)
     except Exception as e:
         print(f"Error reading CSVs: {e}")
         return
@@ -40,18 +56,24 @@ def main():
         print("Warning: 'comment_sentence_id' column missing. Appending without re-indexing.")
 
     # Concatenate (Append)
-    # ignore_index=True resets the Pandas index, but we rely on our 'comment_sentence_id' column
-    df_combined = pd.concat([df_orig, df_new], ignore_index=True)
+    # Arrow tables are concatenated by chaining their column chunks (no copy),
+    # and the result is written by the multithreaded PyArrow CSV writer.
+    # Column order/types are unified, as pd.concat did.
+    t_orig = pa.Table.from_pandas(df_orig, preserve_index=False)
+    t_new = pa.Table.from_pandas(df_new, preserve_index=False)
+    combined = pa.concat_tables([t_orig, t_new], promote_options="default")
 
     # Save to new file
-    df_combined.to_csv(OUTPUT_FILE, index=False)
+    pacsv.write_csv(combined, OUTPUT_FILE)
 
     print(f"\nSuccess! Merged file saved as: {OUTPUT_FILE}")
-    print(f"Total rows: {len(df_combined)}")
+    print(f"Total rows: {combined.num_rows}")
     print("Preview of the join point:")
     
     # Show the last 2 rows of original and first 2 rows of new to verify ID continuity
-    print(df_combined.iloc[len(df_orig)-2 : len(df_orig)+2].to_string())
+    join_point = combined.slice(len(df_orig) - 2, 4).to_pandas()
+    join_point.index = range(len(df_orig) - 2, len(df_orig) - 2 + len(join_point))
+    print(join_point.to_string())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -13,12 +14,20 @@ def balance_dataset(file_path, output_path, target_column, target_count=5000):
         # 2. Apply downsampling per category
         # If a category has > 5000 rows, it samples 5000.
         # If a category has < 5000 rows, it keeps all of them (min logic).
-        df_balanced = df.groupby(target_column, group_keys=False).apply(
-            lambda x: x.sample(n=min(len(x), target_count), random_state=42)
-        )
+        # Sampling works on the row positions of each group, so the
+        # DataFrame is only sliced once at the end.
+        rng = np.random.default_rng(42)
+        groups = df.groupby(target_column).indices
+        samples = [
+            rng.choice(idx, size=min(len(idx), target_count), replace=False)
+            for idx in groups.values()
+        ]
+        # No rows (or only missing categories) gives an empty balanced dataset
+        picks = np.concatenate(samples) if samples else np.array([], dtype=np.intp)
 
         # 3. Shuffle the final result so categories are mixed
-        df_balanced = df_balanced.sample(frac=1, random_state=42).reset_index(drop=True)
+        rng.shuffle(picks)
+        df_balanced = df.iloc[picks].reset_index(drop=True)
 
         # 4. Print Summary
         print("-" * 30)